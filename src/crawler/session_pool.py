@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import requests
+
+from crawler.throttling import RateLimiter
+
+BLOCKED_STATUSES = (403, 429)
+
+DEFAULT_HEADERS = {
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+IDENTITY_EXAMPLE = '{"proxy": "http://host:port", "user_agent": "...", "requests_per_minute": 30}'
+
+def _is_positive_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+
+def _validate_identities(identities: Any, requests_per_minute: Any) -> None:
+    """
+    Raise ValueError describing the first malformed identity setting.
+    """
+    if not _is_positive_number(requests_per_minute):
+        raise ValueError(f"'requests_per_minute' must be a positive number, got {requests_per_minute!r}")
+    if not isinstance(identities, list):
+        raise ValueError(f"'identities' must be a list of objects such as {IDENTITY_EXAMPLE}")
+    for i, identity in enumerate(identities):
+        if not isinstance(identity, dict):
+            raise ValueError(f"identities[{i}] must be an object such as {IDENTITY_EXAMPLE}, got {identity!r}")
+        for key in ("name", "proxy", "user_agent"):
+            value = identity.get(key)
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"identities[{i}].{key} must be a string, got {value!r}")
+        headers = identity.get("headers")
+        if headers is not None and not (
+                isinstance(headers, dict)
+                and all(isinstance(k, str) and isinstance(v, str) for k, v in headers.items())):
+            raise ValueError(f"identities[{i}].headers must be an object of string values, got {headers!r}")
+        rpm = identity.get("requests_per_minute")
+        if rpm is not None and not _is_positive_number(rpm):
+            raise ValueError(f"identities[{i}].requests_per_minute must be a positive number, got {rpm!r}")
+
+class PooledSession:
+    """
+    One egress identity: its own requests.Session (proxy, headers, cookie jar),
+    its own rate budget and live health statistics.
+    """
+    def __init__(self, name: str, session: requests.Session, limiter: RateLimiter,
+                 proxies: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.session = session
+        self.limiter = limiter
+        self.proxies = proxies
+        self.successes = 0
+        self.failures = 0
+        self.latency = 0.0
+        self.consecutive_blocks = 0
+        self.quarantined_until = 0.0
+
+    @property
+    def attempts(self) -> int:
+        return self.successes + self.failures
+
+    def score(self) -> float:
+        """
+        Smoothed success rate; an unused session scores 0.5.
+        """
+        return (self.successes + 1) / (self.attempts + 2)
+
+    def routing_key(self) -> Tuple[float, float]:
+        """
+        Sort key for routing (higher is better). Success rate decides; only
+        rates within a percentage point tie, and then lower latency wins.
+        """
+        return round(self.score(), 2), -self.latency
+
+    def is_quarantined(self, now: float) -> bool:
+        return now < self.quarantined_until
+
+class SessionPool:
+    """
+    Routes each request to the healthiest available session and fails it over
+    to the next one on 403/429 or network errors. Sessions answering 403/429
+    are quarantined with an exponentially growing cool-down.
+
+    With no identities configured the pool holds one direct session which is
+    never quarantined, so a block only loses that request, as before.
+    """
+    def __init__(self, identities: List[Dict[str, Any]], requests_per_minute: float,
+                 user_agent: str, quarantine_seconds: float = 120.0,
+                 max_quarantine_seconds: float = 1800.0, latency_alpha: float = 0.3):
+        _validate_identities(identities, requests_per_minute)
+        self.quarantine_seconds = quarantine_seconds
+        self.max_quarantine_seconds = max_quarantine_seconds
+        self.latency_alpha = latency_alpha
+        self.quarantine_enabled = bool(identities)
+        self._lock = threading.Lock()
+        self.sessions: List[PooledSession] = []
+        for i, identity in enumerate(identities or [{}]):
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            session.headers["User-Agent"] = identity.get("user_agent") or user_agent
+            session.headers.update(identity.get("headers") or {})
+            proxy = identity.get("proxy")
+            # Passed per request: requests lets HTTP(S)_PROXY override Session.proxies.
+            proxies = {"http": proxy, "https": proxy} if proxy else None
+            rpm = identity.get("requests_per_minute")
+            if rpm is None:
+                rpm = requests_per_minute
+            name = identity.get("name") or proxy or f"direct-{i}"
+            self.sessions.append(PooledSession(name, session, RateLimiter(max_calls=rpm, per_seconds=60.0),
+                                               proxies=proxies))
+
+    def _checkout(self, exclude: Optional[Set[PooledSession]] = None) -> Optional[PooledSession]:
+        """
+        Reserve a rate token on the best healthy session. Sleeps (outside all
+        locks) until a token or a quarantined session frees up. When failing
+        over (`exclude` given), returns None instead of waiting on quarantine.
+        """
+        exclude = exclude or set()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                candidates = [s for s in self.sessions if s not in exclude]
+                available = [s for s in candidates if not s.is_quarantined(now)]
+                if available:
+                    available.sort(key=lambda s: s.routing_key(), reverse=True)
+                    for s in available:
+                        if s.limiter.try_acquire():
+                            return s
+                    wait = min(s.limiter.wait_time() for s in available)
+                elif exclude or not candidates:
+                    return None
+                else:
+                    wait = min(s.quarantined_until for s in candidates) - now
+                    logging.warning("All %d sessions quarantined; waiting %.1fs", len(candidates), wait)
+            time.sleep(max(wait, 0.01))
+
+    def _record(self, s: PooledSession, elapsed: float, status: Optional[int],
+                retry_after: Optional[str] = None) -> None:
+        with self._lock:
+            s.latency = elapsed if s.attempts == 0 else (
+                self.latency_alpha * elapsed + (1 - self.latency_alpha) * s.latency)
+            if status is not None and 200 <= status < 400:
+                s.successes += 1
+                s.consecutive_blocks = 0
+                return
+            s.failures += 1
+            if status in BLOCKED_STATUSES and self.quarantine_enabled:
+                s.consecutive_blocks += 1
+                cooldown = self.quarantine_seconds * 2 ** (s.consecutive_blocks - 1)
+                if retry_after and retry_after.isdigit():
+                    cooldown = max(cooldown, float(retry_after))
+                cooldown = min(cooldown, self.max_quarantine_seconds)
+                s.quarantined_until = time.monotonic() + cooldown
+                logging.warning("Session %s got HTTP %s; quarantined for %.0fs", s.name, status, cooldown)
+
+    def get(self, url: str, timeout: int) -> requests.Response:
+        """
+        GET url through the healthiest session, failing over to the next
+        session on 403/429 or a network error. Returns the last response, or
+        re-raises the last network error, once no untried session is left.
+        """
+        tried: Set[PooledSession] = set()
+        resp: Optional[requests.Response] = None
+        error: Optional[Exception] = None
+        for _ in range(len(self.sessions)):
+            s = self._checkout(tried)
+            if s is None:
+                break
+            tried.add(s)
+            start = time.monotonic()
+            try:
+                resp = s.session.get(url, timeout=timeout, proxies=s.proxies)
+            except Exception as e:
+                self._record(s, time.monotonic() - start, None)
+                logging.warning("Session %s failed for %s: %s", s.name, url, e)
+                resp, error = None, e
+                continue
+            self._record(s, time.monotonic() - start, resp.status_code, resp.headers.get("Retry-After"))
+            if resp.status_code not in BLOCKED_STATUSES:
+                return resp
+        if resp is None and error is not None:
+            raise error
+        return resp
+
+    def close(self) -> None:
+        for s in self.sessions:
+            s.session.close()
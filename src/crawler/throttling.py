@@ -15,15 +15,38 @@ class RateLimiter:
         self._tokens = max_calls
         self._last = time.monotonic()
 
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last
+        refill = (elapsed / self.per_seconds) * self.max_calls
+        if refill > 0:
+            self._tokens = min(self.max_calls, self._tokens + refill)
+            self._last = now
+
+    def try_acquire(self) -> bool:
+        """
+        Consume a token if one is available right now; never sleeps.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def wait_time(self) -> float:
+        """
+        Seconds until a token becomes available (0.0 if one is available now).
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                return 0.0
+            return ((1 - self._tokens) / self.max_calls) * self.per_seconds
+
     def acquire(self) -> None:
         with self._lock:
-            now = time.monotonic()
-            elapsed = now - self._last
-            # Refill
-            refill = (elapsed / self.per_seconds) * self.max_calls
-            if refill > 0:
-                self._tokens = min(self.max_calls, self._tokens + refill)
-                self._last = now
+            self._refill()
 
             if self._tokens >= 1:
                 self._tokens -= 1
@@ -12,12 +12,12 @@ if str(THIS_DIR) not in sys.path:
     sys.path.insert(0, str(THIS_DIR))
 
 from crawler.pagination import build_pagination_urls
-from crawler.throttling import RateLimiter, backoff
+from crawler.session_pool import SessionPool
+from crawler.throttling import backoff
 from exporters.json_exporter import JsonExporter
 from exporters.csv_exporter import CsvExporter
 from parsers.listing_parser import parse_listings_from_html
 from dateutil import tz
-import requests
 
 def read_settings(settings_path: Optional[Path]) -> Dict[str, Any]:
     defaults = {
@@ -29,6 +29,8 @@ def read_settings(settings_path: Optional[Path]) -> Dict[str, Any]:
         "user_agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
                       "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
         "timeout_seconds": 20,
+        "identities": [],
+        "quarantine_seconds": 120,
     }
     if settings_path and settings_path.exists():
         try:
@@ -58,7 +60,7 @@ def load_input_urls(input_arg: Optional[str], inputs_file: Optional[Path]) -> Li
             seen.add(u)
     return uniq
 
-def fetch(session: requests.Session, url: str, timeout: int) -> Optional[str]:
+def fetch(pool: SessionPool, url: str, timeout: int) -> Optional[str]:
     try:
         if url.startswith("file://"):
             path = Path(url[7:])
@@ -67,7 +69,7 @@ def fetch(session: requests.Session, url: str, timeout: int) -> Optional[str]:
             # Local path
             return Path(url).read_text(encoding="utf-8")
         else:
-            resp = session.get(url, timeout=timeout)
+            resp = pool.get(url, timeout=timeout)
             if 200 <= resp.status_code < 300:
                 return resp.text
             logging.warning("HTTP %s from %s", resp.status_code, url)
@@ -113,7 +115,7 @@ def main(argv: Optional[List[str]] = None) -> int:
     fmt = (args.format or settings["output_format"]).lower()
     output_path = Path(args.out or settings["output_path"])
     max_results = args.max_results or int(settings["max_results"])
-    requests_per_minute = int(settings["requests_per_minute"])
+    requests_per_minute = float(settings["requests_per_minute"])
     timeout_seconds = int(settings["timeout_seconds"])
     user_agent = settings["user_agent"]
 
@@ -126,33 +128,38 @@ def main(argv: Optional[List[str]] = None) -> int:
         logging.error("No input URLs provided. Use --url or provide a file in data/inputs.sample.txt.")
         return 2
 
-    limiter = RateLimiter(max_calls=requests_per_minute, per_seconds=60.0)
-
-    session = requests.Session()
-    session.headers.update({
-        "User-Agent": user_agent,
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    })
+    # Each identity gets its own session, proxy, cookie jar and rate budget.
+    try:
+        pool = SessionPool(
+            identities=settings["identities"],
+            requests_per_minute=requests_per_minute,
+            user_agent=user_agent,
+            quarantine_seconds=float(settings["quarantine_seconds"]),
+        )
+    except ValueError as e:
+        logging.error("Invalid settings: %s", e)
+        return 2
 
     all_rows: List[Dict[str, Any]] = []
-    for base_url in urls:
-        pages = args.pages
-        to_fetch: Iterable[str] = build_pagination_urls(base_url, max_results=max_results, max_pages=pages)
-        for page_url in to_fetch:
-            if len(all_rows) >= max_results:
-                break
-            limiter.acquire()
-            html = backoff(lambda: fetch(session, page_url, timeout_seconds), tries=3, first_delay=1.5)
-            if not html:
-                continue
-            rows = parse_listings_from_html(html, source_url=page_url)
-            for r in rows:
-                all_rows.append(r)
+    try:
+        for base_url in urls:
+            pages = args.pages
+            to_fetch: Iterable[str] = build_pagination_urls(base_url, max_results=max_results, max_pages=pages)
+            for page_url in to_fetch:
                 if len(all_rows) >= max_results:
                     break
-        if len(all_rows) >= max_results:
-            break
+                html = backoff(lambda: fetch(pool, page_url, timeout_seconds), tries=3, first_delay=1.5)
+                if not html:
+                    continue
+                rows = parse_listings_from_html(html, source_url=page_url)
+                for r in rows:
+                    all_rows.append(r)
+                    if len(all_rows) >= max_results:
+                        break
+            if len(all_rows) >= max_results:
+                break
+    finally:
+        pool.close()
 
     # Dedup by jobkey where present
     seen_keys = set()
@@ -0,0 +1,185 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pytest
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from crawler.session_pool import SessionPool
+
+URL = "http://jobs.example/search"
+
+def _stand_in_proxy(statuses: Union[int, List[int]], headers: Optional[Dict[str, str]] = None,
+                    delay: float = 0.0):
+    """
+    Local HTTP server that answers every GET (proxied or direct) itself,
+    cycling through `statuses` and recording the User-Agent it saw.
+    """
+    cycle = [statuses] if isinstance(statuses, int) else statuses
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = cycle[len(seen) % len(cycle)]
+            seen.append(self.headers.get("User-Agent"))
+            time.sleep(delay)
+            body = b"<html>ok</html>"
+            self.send_response(status)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", seen
+
+def _stop(*servers) -> None:
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture(autouse=True)
+def _no_env_proxies(monkeypatch):
+    for var in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY",
+                "http_proxy", "https_proxy", "all_proxy", "no_proxy"):
+        monkeypatch.delenv(var, raising=False)
+
+def test_blocked_session_is_quarantined_and_request_fails_over():
+    blocked, blocked_url, blocked_seen = _stand_in_proxy(429)
+    healthy, healthy_url, healthy_seen = _stand_in_proxy(200)
+    pool = SessionPool(
+        identities=[
+            {"name": "blocked", "proxy": blocked_url, "user_agent": "ua-blocked"},
+            {"name": "healthy", "proxy": healthy_url, "user_agent": "ua-healthy"},
+        ],
+        requests_per_minute=600,
+        user_agent="ua-default",
+        quarantine_seconds=60,
+    )
+    try:
+        statuses = [pool.get(URL, timeout=5).status_code for _ in range(5)]
+    finally:
+        pool.close()
+        _stop(blocked, healthy)
+
+    # Equal initial scores: the first request goes to "blocked", then fails over.
+    assert statuses == [200] * 5
+    assert blocked_seen == ["ua-blocked"]
+    assert healthy_seen == ["ua-healthy"] * 5
+    by_name = {s.name: s for s in pool.sessions}
+    assert by_name["blocked"].is_quarantined(time.monotonic())
+
+def test_identity_proxy_wins_over_environment_proxy(monkeypatch):
+    server, url, seen = _stand_in_proxy(200)
+    for var in ("HTTP_PROXY", "HTTPS_PROXY", "http_proxy", "https_proxy"):
+        monkeypatch.setenv(var, "http://127.0.0.1:9")
+    pool = SessionPool(identities=[{"proxy": url}], requests_per_minute=600, user_agent="ua")
+    try:
+        resp = pool.get(URL, timeout=5)
+    finally:
+        pool.close()
+        _stop(server)
+    assert resp.status_code == 200
+    assert seen == ["ua"]
+
+def test_retry_after_extends_quarantine():
+    server, url, _ = _stand_in_proxy(429, headers={"Retry-After": "600"})
+    pool = SessionPool(identities=[{"proxy": url}], requests_per_minute=600, user_agent="ua",
+                       quarantine_seconds=60)
+    try:
+        assert pool.get(URL, timeout=5).status_code == 429
+    finally:
+        pool.close()
+        _stop(server)
+    remaining = pool.sessions[0].quarantined_until - time.monotonic()
+    assert 590 < remaining <= 600
+
+def test_cooldown_grows_exponentially_is_capped_and_resets_on_success():
+    server, url, seen = _stand_in_proxy([429, 429, 429, 429, 200, 429])
+    pool = SessionPool(identities=[{"proxy": url}], requests_per_minute=6000, user_agent="ua",
+                       quarantine_seconds=0.05, max_quarantine_seconds=0.15)
+    cooldowns = []
+    try:
+        for _ in range(6):
+            # Each call waits out the previous quarantine before it is sent.
+            status = pool.get(URL, timeout=5).status_code
+            if status == 429:
+                cooldowns.append(pool.sessions[0].quarantined_until - time.monotonic())
+    finally:
+        pool.close()
+        _stop(server)
+    assert len(seen) == 6
+    assert cooldowns == pytest.approx([0.05, 0.1, 0.15, 0.15, 0.05], abs=0.02)
+
+def test_direct_fallback_session_is_never_quarantined():
+    server, url, seen = _stand_in_proxy(429)
+    pool = SessionPool(identities=[], requests_per_minute=6000, user_agent="ua",
+                       quarantine_seconds=60)
+    try:
+        start = time.monotonic()
+        statuses = [pool.get(url, timeout=5).status_code for _ in range(3)]
+        elapsed = time.monotonic() - start
+    finally:
+        pool.close()
+        _stop(server)
+    assert statuses == [429] * 3
+    assert len(seen) == 3
+    assert elapsed < 5
+    assert not pool.sessions[0].is_quarantined(time.monotonic())
+
+def test_success_rate_outweighs_latency():
+    # "fast" answers instantly but is blocked about a third of the time;
+    # "reliable" is slower and fails one request in ten.
+    fast, fast_url, fast_seen = _stand_in_proxy([200] * 6 + [429, 200, 429, 429])
+    reliable, reliable_url, reliable_seen = _stand_in_proxy([200] * 9 + [500], delay=0.02)
+    pool = SessionPool(
+        identities=[{"name": "fast", "proxy": fast_url}, {"name": "reliable", "proxy": reliable_url}],
+        requests_per_minute=6000,
+        user_agent="ua",
+        quarantine_seconds=0.01,
+    )
+    try:
+        for _ in range(30):
+            pool.get(URL, timeout=5)
+    finally:
+        pool.close()
+        _stop(fast, reliable)
+    # Once "reliable" has a better track record it keeps the traffic despite
+    # being slower: 7 requests served by "fast", 2 failovers + 21 to "reliable".
+    assert len(fast_seen) == 9
+    assert len(reliable_seen) == 23
+    by_name = {s.name: s for s in pool.sessions}
+    assert by_name["reliable"].latency > by_name["fast"].latency
+
+@pytest.mark.parametrize("identities, rpm", [
+    (["http://proxy:8080"], 60),
+    ({"proxy": "http://proxy:8080"}, 60),
+    ([{"proxy": 8080}], 60),
+    ([{"user_agent": ["ua"]}], 60),
+    ([{"headers": "Accept: */*"}], 60),
+    ([{"requests_per_minute": 0}], 60),
+    ([{"requests_per_minute": -1}], 60),
+    ([{"requests_per_minute": "30"}], 60),
+    ([], 0),
+])
+def test_invalid_settings_are_rejected(identities, rpm):
+    with pytest.raises(ValueError):
+        SessionPool(identities=identities, requests_per_minute=rpm, user_agent="ua")
+
+def test_fractional_budget_is_kept():
+    pool = SessionPool(identities=[{"requests_per_minute": 0.5}], requests_per_minute=30, user_agent="ua")
+    pool.close()
+    assert pool.sessions[0].limiter.max_calls == 0.5